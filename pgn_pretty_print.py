@@ -2,17 +2,118 @@
 
 
 import argparse
+import functools
+import multiprocessing
 import os
+import re
 from io import StringIO, BytesIO
-import chess
-import chess.pgn
-from reportlab.platypus import Table, Image, Frame, BaseDocTemplate, Paragraph, PageTemplate, SimpleDocTemplate
-from reportlab.lib.units import cm
-from reportlab.lib.pagesizes import A4, letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
-from reportlab.platypus.flowables import KeepTogether
+# python-chess and ReportLab are imported where they are needed, so the command line
+# interface starts (and fails on wrong arguments) without loading them
+
+# Piece symbols (as in FEN) and the names of their images
+PIECES = {'P': 'wp', 'N': 'wn', 'B': 'wb', 'R': 'wr', 'Q': 'wq', 'K': 'wk',
+          'p': 'bp', 'n': 'bn', 'b': 'bb', 'r': 'br', 'q': 'bq', 'k': 'bk'}
+# Move of a board to be printed on the command line, e.g. '10w' or '3b'
+PRINT_BOARD_TOKEN = re.compile(r'([1-9]\d*)([wb])')
+# Table coordinates of all 64 tiles, flagged 1 for dark and 0 for light tiles
+CHECKER_COORDS = [((i, j), (i + j) & 1) for j in range(8) for i in range(8)]
+
+
+@functools.lru_cache(maxsize=None)
+def get_board_diagram_class():
+    # The flowable subclass needs ReportLab, so it is only defined when the first diagram is created
+    from reportlab.lib import colors
+    from reportlab.platypus.flowables import Flowable
+
+    class BoardDiagram(Flowable):
+        # A chess board drawn as one flowable: the checkerboard as rectangles and the pieces as
+        # images, which ReportLab embeds only once per piece no matter how many diagrams there are.
+        def __init__(self, placement, tile_length, img_size, dark_tile_color, light_tile_color):
+            Flowable.__init__(self)
+            # placement: list of (x, y, piece image) tuples, in points from the lower left corner
+            self.placement = placement
+            self.tile_length = tile_length  # in points
+            self.img_size = img_size  # in points
+            self.dark_tile_color = dark_tile_color
+            self.light_tile_color = light_tile_color
+            self.width = self.height = 8 * tile_length
+            self.hAlign = 'CENTER'
+            # Name of the pdf form holding the empty board, shared by all diagrams of the same size and colors.
+            # It is built from the values themselves, so it is the same in every run. Bytes other than ASCII
+            # letters and digits are hex-escaped, e.g. '#7C7671' becomes '_237C7671'
+            key = '{!r} {} {}'.format(tile_length, dark_tile_color, light_tile_color).encode('utf-8')
+            self.background = 'Checkerboard_' + ''.join(chr(b) if chr(b).isalnum() else '_{:02x}'.format(b)
+                                                        for b in key)
+
+        def wrap(self, availWidth, availHeight):
+            return self.width, self.height
+
+        def draw(self):
+            canv = self.canv
+            tile = self.tile_length
+            # The empty board is drawn only once per document and then referenced by every diagram
+            if not canv.hasForm(self.background):
+                canv.beginForm(self.background, 0, 0, self.width, self.height)
+                canv.setFillColor(self.light_tile_color)
+                canv.rect(0, 0, self.width, self.height, stroke=0, fill=1)
+                canv.setFillColor(self.dark_tile_color)
+                for (i, j), dark in CHECKER_COORDS:
+                    if dark:
+                        canv.rect(i * tile, (7 - j) * tile, tile, tile, stroke=0, fill=1)
+                canv.setStrokeColor(colors.grey)
+                canv.setLineWidth(0.5)
+                canv.rect(0, 0, self.width, self.height, stroke=1, fill=0)
+                canv.endForm()
+            canv.saveState()
+            canv.doForm(self.background)
+            img_size = self.img_size
+            for x, y, image in self.placement:
+                canv.drawImage(image, x, y, img_size, img_size, mask='auto')
+            canv.restoreState()
+
+    return BoardDiagram
+
+
+@functools.lru_cache(maxsize=32)
+def get_stylesheet(font_name, font_size, space_before, space_after):
+    # Styles are never modified after creation, so documents with the same settings share one stylesheet
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    styles = getSampleStyleSheet()
+    # define styles for paragraphs
+    styles.add(ParagraphStyle(
+        'Header',
+        fontSize=font_size,
+        fontName=font_name,
+        spaceBefore=space_before,
+        spaceAfter=space_after,
+        leading=font_size,
+        alignment=TA_CENTER
+    ))
+    styles.add(ParagraphStyle(
+        'Move_Text',
+        fontSize=font_size,
+        fontName=font_name,
+        spaceBefore=space_before,
+        spaceAfter=space_after,
+        leading=font_size,
+    ))
+    return styles
+
+
+@functools.lru_cache(maxsize=None)
+def get_piece_image(path):
+    # Each png is read and decoded only once and then shared by all documents
+    from reportlab.lib.utils import ImageReader
+    with open(path, 'rb') as f:
+        return ImageReader(BytesIO(f.read()))
+
+
+def default_filename(headers):
+    # '[White] - [Black].pdf', with '?' for a missing tag as in the Seven Tag Roster. Headers from
+    # chess.pgn.read_headers have no defaults, unlike the headers of a game from chess.pgn.read_game
+    return '{} - {}.pdf'.format(headers.get('White', '?'), headers.get('Black', '?'))
+
 
 # TODO
 # - immprove pdf-return/pdf-file-save
@@ -28,10 +129,10 @@ class GamePrinter:
                  pgn,
                  output_path='',
                  filename='',
-                 halfmoves_to_be_printed=list(),
+                 halfmoves_to_be_printed=(),
                  dark_tile_color='#7C7671',
                  light_tile_color='#DCD7BC',
-                 page_format=A4,
+                 page_format='A4',
                  page_margin=1.27,  # in cm
                  font_name='Helvetica',
                  font_size=12,
@@ -43,9 +144,9 @@ class GamePrinter:
                  page_numbering=None):
         self.change_game(pgn)
         self.output_path = output_path
-        self.filename = filename if filename else '{} - {}.pdf'.format(self.game.headers.get('White'),
-                                                                       self.game.headers.get('Black'))
-        self.halfmoves_to_be_printed = halfmoves_to_be_printed
+        self.filename = filename if filename else default_filename(self.game.headers)
+        # Copied into a frozenset: fast membership tests and no aliasing of the caller's list
+        self.halfmoves_to_be_printed = frozenset(halfmoves_to_be_printed)
         self.dark_tile_color = dark_tile_color
         self.light_tile_color = light_tile_color
         self.page_margin = page_margin
@@ -56,15 +157,24 @@ class GamePrinter:
         self.col_gap = col_gap
         self.page_layout = page_layout
         self.page_numbering = page_numbering
+        from reportlab.lib.pagesizes import A4, letter
         if page_format == 'letter':
             self.page_format = letter
         else:
             self.page_format = A4
 
-    def init_reportlab(self, save_to_file=True):
-        self.styles = getSampleStyleSheet()
+    def init_reportlab(self, save_to_file=True, fileobj=None):
+        import chess
+        from reportlab.lib.units import cm
+        from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate
+        self.styles = get_stylesheet(self.font_name, self.font_size, self.space_before, self.space_after)
+        # Looked up once, it is used for every paragraph of move text
+        self.move_text_style = self.styles['Move_Text']
         self.buff = BytesIO()
-        self.doc = BaseDocTemplate(os.path.join(self.output_path, self.filename) if save_to_file else self.buff,
+        # The pdf is written to fileobj if given, otherwise to the output path or to self.buff
+        if fileobj is None:
+            fileobj = os.path.join(self.output_path, self.filename) if save_to_file else self.buff
+        self.doc = BaseDocTemplate(fileobj,
                                    pagesize=self.page_format,
                                    leftMargin=self.page_margin * cm,
                                    rightMargin=self.page_margin * cm,
@@ -72,24 +182,6 @@ class GamePrinter:
                                    bottomMargin=self.page_margin * cm,
                                    showBoundary=0,
                                    allowSplitting=1)
-        # define styles for paragraphs
-        self.styles.add(ParagraphStyle(
-            'Header',
-            fontSize=self.font_size,
-            fontName=self.font_name,
-            spaceBefore=self.space_before,
-            spaceAfter=self.space_after,
-            leading=self.font_size,
-            alignment=TA_CENTER
-        ))
-        self.styles.add(ParagraphStyle(
-            'Move_Text',
-            fontSize=self.font_size,
-            fontName=self.font_name,
-            spaceBefore=self.space_before,
-            spaceAfter=self.space_after,
-            leading=self.font_size,
-        ))
         # TODO: Add more Layouts
         if False:
             pass
@@ -101,119 +193,249 @@ class GamePrinter:
             # Set board dimensions relative to the two column layout
             self.board_length = 0.8 * frame_width / cm  # in cm
             self.tile_length = self.board_length / 8  # in cm
+        # Paths of the piece images by (piece type, color). The images are only loaded with the first
+        # diagram, so documents without diagrams never touch the piece images path
+        self.piece_image_paths = {(chess.PIECE_SYMBOLS.index(symbol.lower()), symbol.isupper()):
+                                  os.path.join(self.piece_images_path, f'{piece}.png')
+                                  for symbol, piece in PIECES.items()}
+        self.piece_images = None
+        # Size of tiles and piece images and position (lower left corner on each square) of the pieces, in points
+        self.tile_size = self.tile_length * cm
+        self.img_size = self.tile_size * (1 - self.tile_padding)
+        offset = (self.tile_size - self.img_size) / 2
+        self.square_origins = [(chess.square_file(square) * self.tile_size + offset,
+                                chess.square_rank(square) * self.tile_size + offset)
+                               for square in chess.SQUARES]
+        # Diagrams by piece placement (bitboards of pieces and colors) of the current document
+        self.diagram_cache = {}
 
     def change_game(self, pgn):
-        if type(pgn) is str and os.path.exists(pgn):
+        import chess.pgn
+        if isinstance(pgn, chess.pgn.Game):
+            self.game = pgn
+        elif type(pgn) is str and os.path.exists(pgn):
             with open(pgn) as f:
                 self.game = chess.pgn.read_game(f)
         else:
             self.game = chess.pgn.read_game(StringIO(pgn))
 
-    def get_file_path(self):
-        return os.path.join(self.output_path, self.doc_name)
+    @classmethod
+    def iter_games(cls, pgn_path):
+        # Lazily parse a pgn file with several games, one game at a time
+        import chess.pgn
+        with open(pgn_path) as f:
+            yield from iter(lambda: chess.pgn.read_game(f), None)
+
+    @classmethod
+    def iter_game_offsets(cls, pgn_path):
+        # Only the headers of each game are parsed, the move text is skipped without building a game tree.
+        # The offsets can be used to seek to and read a single game later on
+        import chess.pgn
+        with open(pgn_path) as f:
+            offset = f.tell()
+            headers = chess.pgn.read_headers(f)
+            while headers is not None:
+                yield offset, headers
+                offset = f.tell()
+                headers = chess.pgn.read_headers(f)
 
     def board_from_FEN(self, fen):
-        # Generate Data for Table from FEN-Code
-        board_setup_fen = fen.split(' ')[0]
-        rank_setup_fen = board_setup_fen.split('/')
-        board_setup = []
-        for rank in rank_setup_fen:
-            rank_setup = []
-            for tile in rank:
-                if tile.isalpha():
-                    piece = 'w{}'.format(tile.lower()) if tile.isupper() else 'b{}'.format(tile)
-                    img_size = self.tile_length * (1 - self.tile_padding) * cm
-                    img = Image('{}{}.png'.format(self.piece_images_path, piece), width=img_size, height=img_size)
-                    rank_setup.append(img)
-                elif tile.isdigit():
-                    rank_setup += [None] * int(tile)
-                else:
-                    print('{} is not valid in {}'.format(tile, board_setup_fen))
-            board_setup.append(rank_setup)
-        # Arrange chess board as table
-        table_style = [('ALIGN', (0, 0), (7, 7), 'CENTER'),
-                       ('VALIGN', (0, 0), (7, 7), 'MIDDLE'),
-                       ('BOX', (0, 0), (7, 7), 0.5, colors.grey)]
-        # Color cells according to a chess board
-        dark_tile_coords = [(i, j) for j in range(8) for i in range(8) if j % 2 is 1 and i % 2 is 0 or j % 2 is 0 and i % 2 is 1]
-        light_tile_coords = [(i, j) for j in range(8) for i in range(8) if j % 2 is 0 and i % 2 is 0 or j % 2 is 1 and i % 2 is 1]
-        table_style += [('BACKGROUND', coord, coord, self.dark_tile_color) for coord in dark_tile_coords]
-        table_style += [('BACKGROUND', coord, coord, self.light_tile_color) for coord in light_tile_coords]
-        return Table(board_setup, colWidths=[self.tile_length * cm] * 8, rowHeights=[self.tile_length * cm] * 8, style=table_style)
-
-    def print_move_and_variations(self, move, halfmove):
-        # [move number (if white to move)] [move (san)] [comment]
-        # examples: '1. e4', 'c5'
-        move_number = int((halfmove + 2) / 2)
-        white_to_move = halfmove % 2 is 0
-        # Force print of move number for a black move
-        text = '<strong>{}{}</strong>{}'.format('{}. '.format(move_number) if white_to_move else '',
-                                                move.san(),
-                                                ' {}'.format(move.comment) if move.comment else '')
-        # If game has variations at this point they will be printed including comments.
-        # examples: 'c5 (1... e5 2. Nf3)', '2. Nf3 (2. d4 a more direct approach)'
-        if len(move.parent.variations) > 1:
-            for i in range(1, len(move.parent.variations)):
-                text += ' (<i>'
-                # This will only add the first move of the variation
-                text += '<strong>{}{}</strong>{}'.format('{}. '.format(move_number) if white_to_move else '{}... '.format(move_number),
-                                                         move.parent.variations[i].san(),
-                                                         ' {}'.format(move.parent.variations[i].comment) if move.parent.variations[i].comment else '')
-                # For the following moves recursivly explore the variation tree
-                # This will also include subvariations
-                for j, var_move in enumerate(move.parent.variations[i].mainline()):
-                    text += ' {}'.format(self.print_move_and_variations(var_move, halfmove + 1 + j))
-                text += '</i>)'
-        return text
+        # Only the piece placement (first field) of the FEN-Code is relevant for the diagram
+        import chess
+        return self.board_from_board(chess.BaseBoard(fen.split(' ')[0]))
+
+    def board_from_board(self, board):
+        import chess
+        # Positions that occur more than once (transpositions, repetitions) reuse their diagram.
+        # The bitboards identify the piece placement without building a FEN-Code
+        placement_key = (board.occupied_co[chess.WHITE], board.pawns, board.knights, board.bishops,
+                         board.rooks, board.queens, board.kings)
+        if placement_key in self.diagram_cache:
+            return self.diagram_cache[placement_key]
+        # The diagram is a single flowable instead of a table with 64 cells, the squares of
+        # each kind of piece are read directly from its bitboard
+        # Piece images, shared by all diagrams, each image is embedded only once
+        if self.piece_images is None:
+            self.piece_images = {key: get_piece_image(path) for key, path in self.piece_image_paths.items()}
+        square_origins = self.square_origins
+        placement = []
+        for (piece_type, color), image in self.piece_images.items():
+            for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                x, y = square_origins[square]
+                placement.append((x, y, image))
+        diagram = get_board_diagram_class()(placement, self.tile_size, self.img_size, self.dark_tile_color, self.light_tile_color)
+        self.diagram_cache[placement_key] = diagram
+        return diagram
+
+    def move_text(self, san, comment, halfmove, force_move_number=False):
+        # [move number (if white to move or forced)] [move (san)] [comment]
+        # examples: '1. e4', 'c5', '1... c5'
+        move_number = (halfmove >> 1) + 1
+        if not halfmove & 1:
+            text = f'<strong>{move_number}. {san}</strong>'
+        elif force_move_number:
+            text = f'<strong>{move_number}... {san}</strong>'
+        else:
+            text = f'<strong>{san}</strong>'
+        # Board markers '<*>' are only relevant for create_document and not printed
+        comment = comment.replace('<*>', '').strip()
+        return f'{text} {comment}' if comment else text
+
+    def print_move_and_variations(self, move, halfmove, parts=None, board=None):
+        # Text fragments are collected in parts and joined once by the top-level call
+        top_level = parts is None
+        if top_level:
+            parts = []
+        # board is the position before move. The san of every move is taken from boards that are
+        # updated along each line, GameNode.san() would replay the game from the start every time
+        if board is None:
+            board = move.parent.board()
+        # The variation tree is explored with an explicit stack instead of recursion. Entries are either text,
+        # ('move' or 'line move', move, halfmove, position before the move) or
+        # ('line', iterator over a variation, halfmove, position after the previous move of the variation)
+        stack = [('move', move, halfmove, board)]
+        # Bound once, they are used for every move of the tree
+        push = stack.append
+        move_text = self.move_text
+        while stack:
+            entry = stack.pop()
+            if type(entry) is str:
+                parts.append(entry)
+                continue
+            kind, node, halfmove, board = entry
+            if kind == 'line':
+                # Continue the variation with its next move, the rest of the line is handled afterwards
+                var_move = next(node, None)
+                if var_move is not None:
+                    push(('line', node, halfmove + 1, board))
+                    push(('line move', var_move, halfmove, board))
+                    push(' ')
+                continue
+            parts.append(move_text(board.san(node.move), node.comment, halfmove))
+            # If game has variations at this point they will be printed including comments.
+            # examples: 'c5 (1... e5 2. Nf3)', '2. Nf3 (2. d4 a more direct approach)'
+            variations = node.parent.variations
+            if len(variations) > 1:
+                # Pushed in reverse so that the variations are printed in their original order
+                for var in reversed(variations[1:]):
+                    var_board = board.copy(stack=False)
+                    var_san = var_board.san(var.move)
+                    var_board.push(var.move)
+                    push('</i>)')
+                    # The following moves of the variation, including their subvariations
+                    push(('line', iter(var.mainline()), halfmove + 1, var_board))
+                    # This will only add the first move of the variation
+                    push(move_text(var_san, var.comment, halfmove, force_move_number=True))
+                    push(' (<i>')
+            if kind == 'line move':
+                # The variation continues from the position after this move. The board of the
+                # top-level move belongs to the caller and is left untouched
+                board.push(node.move)
+        if top_level:
+            return ''.join(parts)
+
+    def flush_paragraph(self, elements, paragraph):
+        # Turn the collected move text into a single Paragraph, without adding empty
+        # paragraphs e.g. for diagrams on the first or on consecutive moves
+        from reportlab.platypus import Paragraph
+        if paragraph:
+            elements.append(Paragraph(''.join(paragraph), self.move_text_style))
+            paragraph.clear()
 
     def create_and_return_document(self):
         self.init_reportlab(save_to_file=False)
         self.create_document()
         return self.buff
 
+    def stream_pdf(self, fileobj):
+        # Write the document directly into a file object (e.g. a web response), without the buffer
+        self.init_reportlab(fileobj=fileobj)
+        self.create_document()
+
 
     def create_document(self):
+        from reportlab.platypus import Paragraph
+        from reportlab.platypus.flowables import KeepTogether
         # elements will contain flowables for the build function
         elements = []
         # Paragraph for Heading and meta information
-        paragraph = '<font size={}><strong>{}<i>{}</i><br/> vs.<br/>{}<i>{}</i></strong></font><br/>'.format(
+        headers = self.game.headers
+        header = ['<font size={}><strong>{}<i>{}</i><br/> vs.<br/>{}<i>{}</i></strong></font><br/>'.format(
             self.font_size + 2,
-            self.game.headers.get('White'),
-            ' [{}]'.format(self.game.headers.get('WhiteElo')) if self.game.headers.get('WhiteElo') else '',
-            self.game.headers.get('Black'),
-            ' [{}]'.format(self.game.headers.get('BlackElo')) if self.game.headers.get('BlackElo') else '')
-        for key in self.game.headers.keys():
-            if key != 'White' and key != 'Black' and key != 'WhiteElo' and key != 'BlackElo' and self.game.headers.get(key) != '?':
-                paragraph += '<br/>{}: {}'.format(key, self.game.headers.get(key))
-        elements.append(Paragraph(paragraph, self.styles['Header']))
+            headers.get('White'),
+            ' [{}]'.format(headers.get('WhiteElo')) if headers.get('WhiteElo') else '',
+            headers.get('Black'),
+            ' [{}]'.format(headers.get('BlackElo')) if headers.get('BlackElo') else '')]
+        for key, value in headers.items():
+            if key not in {'White', 'Black', 'WhiteElo', 'BlackElo'} and value != '?':
+                header.append('<br/>{}: {}'.format(key, value))
+        elements.append(Paragraph(''.join(header), self.styles['Header']))
         # Generate paragraphs with move text and board diagramms
-        paragraph = str()
-        for i, move in enumerate(self.game.mainline()):
-            if move.comment and '<*>' in move.comment or any([i == halfmove for halfmove in self.halfmoves_to_be_printed]):
-                elements.append(Paragraph(paragraph, self.styles['Move_Text']))
-                elements.append(KeepTogether(self.board_from_FEN(move.board().fen())))
-                paragraph = str()
-            # After print of a board diagramm if it's black's move print move number
-            if any([i == halfmove for halfmove in self.halfmoves_to_be_printed]) and i % 2 == 1:
-                paragraph += '<strong>{}...</strong> {} '.format(int((i + 2) / 2), self.print_move_and_variations(move, i).replace('<*>', '').strip())
+        paragraph = []
+        # The position is updated move by move instead of replaying the game for every diagram
+        board = self.game.board()
+        mainline = list(self.game.mainline())
+        for i, move in enumerate(mainline):
+            # Boards are printed for the requested halfmoves and for moves marked with '<*>'
+            print_board = i in self.halfmoves_to_be_printed or '<*>' in move.comment
+            if print_board:
+                # The diagram goes between the text so far and this move, it is added once the move is made
+                self.flush_paragraph(elements, paragraph)
+                # After print of a board diagramm if it's black's move print move number
+                if i & 1:
+                    paragraph.append(f'<strong>{(i >> 1) + 1}...</strong> ')
+            # The move text is written straight into the paragraph fragments. Only moves with siblings
+            # go through the variation walk, all others are built directly with the san taken from the
+            # incrementally updated board instead of GameNode.san() replaying the game
+            has_siblings = move.parent is not None and len(move.parent.variations) > 1
+            if has_siblings:
+                self.print_move_and_variations(move, i, paragraph, board)
             else:
-                paragraph += self.print_move_and_variations(move, i).replace('<*>', '').strip() + ' '
-        elements.append(Paragraph(paragraph, self.styles['Move_Text']))
+                paragraph.append(self.move_text(board.san(move.move), move.comment, i))
+            paragraph.append(' ')
+            board.push(move.move)
+            if print_board:
+                elements.append(KeepTogether(self.board_from_board(board)))
+        self.flush_paragraph(elements, paragraph)
         self.doc.build(elements)
 
 
-def run(args):
-    # Parse moves to be printed with board
-    halfmoves_to_be_printed = list()
-    for token in args.printBoard.split(' '):
-        # example: '3w' translates to halfmove number 4
-        halfmove = int(token[:-1]) * 2
-        halfmove -= 2 if token[-1] == 'w' else 1
-        halfmoves_to_be_printed.append(halfmove)
-    # Create a GamePrinter Object
-    printer = GamePrinter(args.pgnPath,
+def parse_print_board(print_board):
+    # Translate the moves to be printed with board into halfmove numbers
+    # example: '3w' translates to halfmove number 4
+    halfmoves = set()
+    for token in print_board.split():
+        match = PRINT_BOARD_TOKEN.fullmatch(token)
+        if not match:
+            raise argparse.ArgumentTypeError("'{}' is not a valid move, expected e.g. '2w' or '10b'".format(token))
+        halfmoves.add(int(match[1]) * 2 - (2 if match[2] == 'w' else 1))
+    return frozenset(halfmoves)
+
+
+def parse_jobs(jobs):
+    # Number of worker processes for batch mode, multiprocessing.Pool needs at least one
+    try:
+        number = int(jobs)
+    except ValueError:
+        raise argparse.ArgumentTypeError("'{}' is not a number".format(jobs))
+    if number < 1:
+        raise argparse.ArgumentTypeError('at least one process is needed, got {}'.format(number))
+    return number
+
+
+def print_game(job):
+    # Create a pdf document for a single game, used directly and by the worker processes of batch mode.
+    # Without an offset the first game of the file is printed
+    pgn_path, offset, filename, halfmoves_to_be_printed, args = job
+    pgn = pgn_path
+    if offset is not None:
+        import chess.pgn
+        with open(pgn_path) as f:
+            f.seek(offset)
+            pgn = chess.pgn.read_game(f)
+    printer = GamePrinter(pgn,
                           output_path=args.outputPath,
-                          filename=args.filename,
+                          filename=filename,
                           halfmoves_to_be_printed=halfmoves_to_be_printed,
                           page_margin=args.pageMargin,
                           font_name=args.fontName,
@@ -221,7 +443,28 @@ def run(args):
                           space_before=args.spaceBefore,
                           space_after=args.spaceAfter,
                           col_gap=args.columnGap)
+    printer.init_reportlab()
     printer.create_document()
+    return printer.filename
+
+
+def run(args):
+    # Moves to be printed with board, already translated into halfmoves by parse_print_board
+    halfmoves_to_be_printed = args.printBoard
+    if args.batch:
+        # One document per game. Only headers are read here, each worker parses its own game
+        # example filename: '3 - [White] - [Black].pdf' for the third game of the file
+        jobs = ((args.pgnPath,
+                 offset,
+                 '{} - {}'.format(number, args.filename if args.filename else default_filename(headers)),
+                 halfmoves_to_be_printed,
+                 args)
+                for number, (offset, headers) in enumerate(GamePrinter.iter_game_offsets(args.pgnPath), 1))
+        with multiprocessing.Pool(args.jobs) as pool:
+            for _ in pool.imap_unordered(print_game, jobs):
+                pass
+    else:
+        print_game((args.pgnPath, None, args.filename, halfmoves_to_be_printed, args))
 
 
 def main():
@@ -240,6 +483,7 @@ def main():
                         default='')
     parser.add_argument('-p',
                         '--printBoard',
+                        type=parse_print_board,
                         help='Give a string of moves to be printed (e.g. "2w 3b 10w")',
                         default='1w')
     parser.add_argument('-fs',
@@ -271,8 +515,19 @@ def main():
                         type=float,
                         help='Set the width (in cm) between columns in two-column-layout',
                         default=1)
+    parser.add_argument('-b',
+                        '--batch',
+                        action='store_true',
+                        help='Print every game of the pgn into its own document, using all cpu cores')
+    parser.add_argument('-j',
+                        '--jobs',
+                        type=parse_jobs,
+                        help='Set the number of processes printing games, only with --batch. Default: number of cpu cores',
+                        default=None)
     parser.set_defaults(func=run)
     args = parser.parse_args()
+    if args.jobs is not None and not args.batch:
+        parser.error('argument -j/--jobs: only allowed with -b/--batch')
     args.func(args)
 
 